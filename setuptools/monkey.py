@@ -129,16 +129,26 @@ def get_unpatched_function(candidate):
     return getattr(candidate, 'unpatched')
 
 
+# Set once patch_for_msvc_specialized_compiler has run, so that it only
+# patches distutils once
+_msvc_patched = False
+
+
 def patch_for_msvc_specialized_compiler():
     """
     Patch functions in distutils to use standalone Microsoft Visual C++
     compilers.
     """
+    global _msvc_patched
+    if _msvc_patched:
+        return
+
     # import late to avoid circular imports on Python < 3.5
     msvc = import_module('setuptools.msvc')
 
     if platform.system() != 'Windows':
         # Compilers only availables on Microsoft Windows
+        _msvc_patched = True
         return
 
     def patch_params(mod_name, func_name):
@@ -177,3 +187,5 @@ def patch_for_msvc_specialized_compiler():
         patch_func(*msvc14('gen_lib_options'))
     except ImportError:
         pass
+
+    _msvc_patched = True
@@ -21,32 +21,41 @@ This may also support compilers shipped with compatible Visual Studio versions.
 
 import json
 from io import open
-from os import listdir, pathsep
-from os.path import join, isfile, isdir, dirname
+from os import listdir, pathsep, scandir
+from os.path import join, isfile, isdir, dirname, normcase, normpath, split
 import sys
 import platform
 import itertools
+import functools
 import subprocess
-import distutils.errors
+from distutils.errors import DistutilsPlatformError
+from collections import OrderedDict
 from setuptools.extern.packaging.version import LegacyVersion
 
-from setuptools.extern.six.moves import filterfalse
-
 from .monkey import get_unpatched
 
 if platform.system() == 'Windows':
-    from setuptools.extern.six.moves import winreg
+    import winreg
     from os import environ
+    import ctypes
+    from ctypes import wintypes
+
+    # Cheaper than "os.stat" to check if a path is a directory
+    _GetFileAttributesW = ctypes.WinDLL('kernel32').GetFileAttributesW
+    _GetFileAttributesW.argtypes = (wintypes.LPCWSTR,)
+    _GetFileAttributesW.restype = wintypes.DWORD
 else:
     # Mock winreg and environ so the module can be imported on this platform.
 
     class winreg:
-        HKEY_USERS = None
         HKEY_CURRENT_USER = None
         HKEY_LOCAL_MACHINE = None
-        HKEY_CLASSES_ROOT = None
 
     environ = dict()
+    _GetFileAttributesW = None
+
+_INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
+_FILE_ATTRIBUTE_DIRECTORY = 0x10
 
 _msvc9_suppress_errors = (
     # msvc9compiler isn't available on some platforms
@@ -54,7 +63,7 @@ _msvc9_suppress_errors = (
 
     # msvc9compiler raises DistutilsPlatformError in some
     # environments. See #1118.
-    distutils.errors.DistutilsPlatformError,
+    DistutilsPlatformError,
 )
 
 try:
@@ -62,6 +71,25 @@ try:
 except _msvc9_suppress_errors:
     pass
 
+# Environments already resolved in this process, by version, architecture
+# and inherited paths, see "_inherited_paths"
+_msvc9_env_cache = {}
+_msvc14_env_cache = {}
+
+
+def _inherited_paths():
+    """
+    Return current values of environment variables that are extended with
+    compilers paths, so resolved environments depend on them.
+
+    Return
+    ------
+    tuple of str
+        "include", "lib", "libpath" and "path" values, or None if not set
+    """
+    return tuple(
+        environ.get(name) for name in ('include', 'lib', 'libpath', 'path'))
+
 
 def msvc9_find_vcvarsall(version):
     """
@@ -85,17 +113,15 @@ def msvc9_find_vcvarsall(version):
         vcvarsall.bat path
     """
     vc_base = r'Software\%sMicrosoft\DevDiv\VCForPython\%0.1f'
-    key = vc_base % ('', version)
-    try:
-        # Per-user installs register the compiler path here
-        productdir = Reg.get_value(key, "installdir")
-    except KeyError:
+    productdir = None
+    # Per-user installs register the compiler path in the first key,
+    # all-user installs on a 64-bit system in the second one
+    for node in ('', 'Wow6432Node\\'):
         try:
-            # All-user installs on a 64-bit system register here
-            key = vc_base % ('Wow6432Node\\', version)
-            productdir = Reg.get_value(key, "installdir")
+            productdir = Reg.get_value(vc_base % (node, version), "installdir")
         except KeyError:
-            productdir = None
+            continue
+        break
 
     if productdir:
         vcvarsall = join(productdir, "vcvarsall.bat")
@@ -124,23 +150,31 @@ def msvc9_query_vcvarsall(ver, arch='x86', *args, **kwargs):
     dict
         environment
     """
+    key = ver, arch, _inherited_paths()
+    if key in _msvc9_env_cache:
+        return dict(_msvc9_env_cache[key])
+
     # Try to get environment from vcvarsall.bat (Classical way)
     try:
         orig = get_unpatched(msvc9_query_vcvarsall)
-        return orig(ver, arch, *args, **kwargs)
-    except distutils.errors.DistutilsPlatformError:
+        env = orig(ver, arch, *args, **kwargs)
+    except DistutilsPlatformError:
         # Pass error if Vcvarsall.bat is missing
-        pass
+        env = None
     except ValueError:
         # Pass error if environment not set after executing vcvarsall.bat
-        pass
+        env = None
 
     # If error, try to set environment directly
-    try:
-        return EnvironmentInfo(arch, ver).return_env()
-    except distutils.errors.DistutilsPlatformError as exc:
-        _augment_exception(exc, ver, arch)
-        raise
+    if env is None:
+        try:
+            env = EnvironmentInfo(arch, ver).return_env()
+        except DistutilsPlatformError as exc:
+            _augment_exception(exc, ver, arch)
+            raise
+
+    _msvc9_env_cache[key] = env
+    return dict(env)
 
 
 def _msvc14_find_vc2015():
@@ -185,9 +219,35 @@ def _msvc14_find_vc2017():
     If vswhere.exe is not available, by definition, VS 2017 is not
     installed.
     """
+    path = _vswhere()
+    if not path:
+        return None, None
+
+    path = join(path, "VC", "Auxiliary", "Build")
+    if isdir(path):
+        return 15, path
+
+    return None, None
+
+
+def _vswhere(*args):
+    """
+    Find latest Visual Studio 2017+ installation directory with Microsoft
+    Visual C++ tools using "vswhere.exe".
+
+    Parameters
+    ----------
+    args: str
+        Extra "vswhere.exe" arguments.
+
+    Return
+    ------
+    str
+        path, or None if not found
+    """
     root = environ.get("ProgramFiles(x86)") or environ.get("ProgramFiles")
     if not root:
-        return None, None
+        return None
 
     try:
         path = subprocess.check_output([
@@ -197,15 +257,30 @@ def _msvc14_find_vc2017():
             "-requires", "Microsoft.VisualStudio.Component.VC.Tools.x86.x64",
             "-property", "installationPath",
             "-products", "*",
-        ]).decode(encoding="mbcs", errors="strict").strip()
+        ] + list(args)).decode(encoding="mbcs", errors="strict").strip()
     except (subprocess.CalledProcessError, OSError, UnicodeDecodeError):
-        return None, None
+        return None
 
-    path = join(path, "VC", "Auxiliary", "Build")
-    if isdir(path):
-        return 15, path
+    return path or None
 
-    return None, None
+
+@functools.lru_cache(maxsize=None)
+def _vswhere_installation_path(version):
+    """
+    Find Visual Studio 2017+ installation directory using "vswhere.exe".
+
+    Parameters
+    ----------
+    version: float
+        Required Microsoft Visual Studio version.
+
+    Return
+    ------
+    str
+        path, or None if not found
+    """
+    major = int(version)
+    return _vswhere("-version", "[%d.0,%d.0)" % (major, major + 1))
 
 
 PLAT_SPEC_TO_RUNTIME = {
@@ -265,7 +340,7 @@ def _msvc14_get_vc_env(plat_spec):
 
     vcvarsall, vcruntime = _msvc14_find_vcvarsall(plat_spec)
     if not vcvarsall:
-        raise distutils.errors.DistutilsPlatformError(
+        raise DistutilsPlatformError(
             "Unable to find vcvarsall.bat"
         )
 
@@ -275,7 +350,7 @@ def _msvc14_get_vc_env(plat_spec):
             stderr=subprocess.STDOUT,
         ).decode('utf-16le', errors='replace')
     except subprocess.CalledProcessError as exc:
-        raise distutils.errors.DistutilsPlatformError(
+        raise DistutilsPlatformError(
             "Error executing {}".format(exc.cmd)
         )
 
@@ -309,13 +384,23 @@ def msvc14_get_vc_env(plat_spec):
         environment
     """
 
+    # Environment is taken as-is from the current process with SDK mode
+    cacheable = "DISTUTILS_USE_SDK" not in environ
+    key = plat_spec, _inherited_paths()
+    if cacheable and key in _msvc14_env_cache:
+        return dict(_msvc14_env_cache[key])
+
     # Always use backport from CPython 3.8
     try:
-        return _msvc14_get_vc_env(plat_spec)
-    except distutils.errors.DistutilsPlatformError as exc:
+        env = _msvc14_get_vc_env(plat_spec)
+    except DistutilsPlatformError as exc:
         _augment_exception(exc, 14.0)
         raise
 
+    if cacheable:
+        _msvc14_env_cache[key] = env
+    return dict(env)
+
 
 def msvc14_gen_lib_options(*args, **kwargs):
     """
@@ -344,7 +429,7 @@ def _augment_exception(exc, version, arch=''):
         message = tmpl.format(**locals())
         msdownload = 'www.microsoft.com/download/details.aspx?id=%d'
         if version == 9.0:
-            if arch.lower().find('ia64') > -1:
+            if 'ia64' in arch.lower():
                 # For VC++ 9.0, if IA64 support is needed, redirect user
                 # to Windows SDK 7.0.
                 # Note: No download link available from Microsoft.
@@ -366,6 +451,193 @@ def _augment_exception(exc, version, arch=''):
     exc.args = (message, )
 
 
+@functools.lru_cache(maxsize=256)
+def _registry_lookup(hkeys, key, fallback_key, name):
+    """
+    Look for a value in the first registry hive containing it.
+
+    Results are cached since registry content is not expected to change
+    while building.
+
+    Parameters
+    ----------
+    hkeys: tuple
+        Registry hives where look.
+    key: str
+        Registry key path where look.
+    fallback_key: str
+        Registry key path where look if "key" is not found in a hive.
+    name: str
+        Value name to find.
+
+    Return
+    ------
+    str
+        value
+    """
+    key_read = winreg.KEY_READ
+    openkey = winreg.OpenKey
+    query_value = winreg.QueryValueEx
+    for hkey in hkeys:
+        try:
+            bkey = openkey(hkey, key, 0, key_read)
+        except (OSError, IOError):
+            if not fallback_key:
+                continue
+            try:
+                bkey = openkey(hkey, fallback_key, 0, key_read)
+            except (OSError, IOError):
+                continue
+        try:
+            return query_value(bkey, name)[0]
+        except (OSError, IOError):
+            pass
+
+
+# Names of directories in parents already listed in this process, see
+# "_list_child_dirs"
+_child_dirs_cache = {}
+
+
+def _list_child_dirs(parent):
+    """
+    List and cache names of directories in parent, so "_isdir" can check
+    sibling directories with a single listing of their parent.
+
+    Parameters
+    ----------
+    parent: str
+        Directory to list.
+    """
+    try:
+        # "scandir" entries know if they are directories without extra stat
+        entries = list(scandir(parent))
+        child_dirs = frozenset(
+            normcase(entry.name) for entry in entries if entry.is_dir())
+    except OSError:
+        child_dirs = frozenset()
+    _child_dirs_cache[parent] = child_dirs
+
+
+@functools.lru_cache(maxsize=512)
+def _isdir(path):
+    """
+    Return True if path is an existing directory.
+
+    Results are cached since tools directories are not expected to change
+    while building.
+
+    Parameters
+    ----------
+    path: str
+        Path to check.
+
+    Return
+    ------
+    bool
+        path is a directory
+    """
+    parent, name = split(normpath(path))
+    # Listings only contain long names of directories existing when listed,
+    # so only trust them if they contain name
+    if normcase(name) in _child_dirs_cache.get(parent, ()):
+        return True
+
+    if _GetFileAttributesW is None:
+        return isdir(path)
+
+    attributes = _GetFileAttributesW(path)
+    return (attributes != _INVALID_FILE_ATTRIBUTES and
+            bool(attributes & _FILE_ATTRIBUTE_DIRECTORY))
+
+
+@functools.lru_cache(maxsize=512)
+def _isfile(path):
+    """
+    Return True if path is an existing file.
+
+    Results are cached since tools files are not expected to change
+    while building.
+
+    Parameters
+    ----------
+    path: str
+        Path to check.
+
+    Return
+    ------
+    bool
+        path is a file
+    """
+    if _GetFileAttributesW is None:
+        return isfile(path)
+
+    attributes = _GetFileAttributesW(path)
+    return (attributes != _INVALID_FILE_ATTRIBUTES and
+            not attributes & _FILE_ATTRIBUTE_DIRECTORY)
+
+
+def _list_shared_parents(paths):
+    """
+    List parent directories shared by several paths, so "_isdir" checks
+    these sibling directories with a single listing.
+
+    Only use this on tools directories, as listing parents of other paths
+    (like "System32") may cost more than checking them one by one.
+
+    Parameters
+    ----------
+    paths: iterable of str
+        Paths.
+    """
+    counts = {}
+    for path in paths:
+        parent = split(normpath(path))[0]
+        counts[parent] = counts.get(parent, 0) + 1
+    for parent, count in counts.items():
+        if parent and count > 1 and parent not in _child_dirs_cache:
+            _list_child_dirs(parent)
+
+
+@functools.lru_cache(maxsize=32)
+def _split_paths(value):
+    """
+    Split a pathsep-separated environment variable value.
+
+    Results are cached by value, so an environment variable is only split
+    again if it changed.
+
+    Parameters
+    ----------
+    value: str
+        Environment variable value.
+
+    Return
+    ------
+    tuple of str
+        paths
+    """
+    return tuple(value.split(pathsep))
+
+
+class _cached_property:
+    """
+    Property computed once per instance, then stored as instance attribute.
+
+    Backport of Python 3.8 "functools.cached_property".
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.func.__name__] = self.func(instance)
+        return value
+
+
 class PlatformInfo:
     """
     Current and Target Architectures information.
@@ -375,6 +647,8 @@ class PlatformInfo:
     arch: str
         Target architecture.
     """
+    __slots__ = ('arch',)
+
     current_cpu = environ.get('processor_architecture', '').lower()
 
     def __init__(self, arch):
@@ -490,10 +764,12 @@ class RegistryInfo:
     platform_info: PlatformInfo
         "PlatformInfo" instance.
     """
-    HKEYS = (winreg.HKEY_USERS,
-             winreg.HKEY_CURRENT_USER,
-             winreg.HKEY_LOCAL_MACHINE,
-             winreg.HKEY_CLASSES_ROOT)
+    __slots__ = ('pi',)
+
+    # Visual Studio, SDKs and "VC++ for Python" are only registered per user
+    # or per machine
+    HKEYS = (winreg.HKEY_CURRENT_USER,
+             winreg.HKEY_LOCAL_MACHINE)
 
     def __init__(self, platform_info):
         self.pi = platform_info
@@ -641,24 +917,10 @@ class RegistryInfo:
         str
             value
         """
-        key_read = winreg.KEY_READ
-        openkey = winreg.OpenKey
-        ms = self.microsoft
-        for hkey in self.HKEYS:
-            try:
-                bkey = openkey(hkey, ms(key), 0, key_read)
-            except (OSError, IOError):
-                if not self.pi.current_is_x86():
-                    try:
-                        bkey = openkey(hkey, ms(key, True), 0, key_read)
-                    except (OSError, IOError):
-                        continue
-                else:
-                    continue
-            try:
-                return winreg.QueryValueEx(bkey, name)[0]
-            except (OSError, IOError):
-                pass
+        fallback_key = (
+            None if self.pi.current_is_x86() else self.microsoft(key, True))
+        return _registry_lookup(
+            self.HKEYS, self.microsoft(key), fallback_key, name)
 
 
 class SystemInfo:
@@ -679,6 +941,21 @@ class SystemInfo:
     ProgramFiles = environ.get('ProgramFiles', '')
     ProgramFilesx86 = environ.get('ProgramFiles(x86)', ProgramFiles)
 
+    # Windows SDK versions for MSVC++ versions between 10.0 and 12.0
+    _windows_sdk_versions = {
+        10.0: ('7.1', '7.0a'),
+        11.0: ('8.0', '8.0a'),
+        12.0: ('8.1', '8.1a'),
+    }
+
+    # Universal CRT SDK Kit Roots versions for MSVC++ 14.0+
+    _ucrt_sdk_versions = ('10', '81')
+
+    # .NET Framework SDK versions for MSVC++ 14.0+
+    _netfx_sdk_versions = ('4.7.2', '4.7.1', '4.7',
+                           '4.6.2', '4.6.1', '4.6',
+                           '4.5.2', '4.5.1', '4.5')
+
     def __init__(self, registry_info, vc_ver=None):
         self.ri = registry_info
         self.pi = self.ri.pi
@@ -701,7 +978,7 @@ class SystemInfo:
         reg_vc_vers = self.find_reg_vs_vers()
 
         if not (reg_vc_vers or self.known_vs_paths):
-            raise distutils.errors.DistutilsPlatformError(
+            raise DistutilsPlatformError(
                 'No Microsoft Visual C++ version found')
 
         vc_vers = set(reg_vc_vers)
@@ -719,28 +996,27 @@ class SystemInfo:
         """
         ms = self.ri.microsoft
         vckeys = (self.ri.vc, self.ri.vc_for_python, self.ri.vs)
-        vs_vers = []
+        key_read = winreg.KEY_READ
+        openkey = winreg.OpenKey
+        enum_value = winreg.EnumValue
+        enum_key = winreg.EnumKey
+        vs_vers = set()
         for hkey in self.ri.HKEYS:
             for key in vckeys:
                 try:
-                    bkey = winreg.OpenKey(hkey, ms(key), 0, winreg.KEY_READ)
+                    bkey = openkey(hkey, ms(key), 0, key_read)
                 except (OSError, IOError):
                     continue
-                subkeys, values, _ = winreg.QueryInfoKey(bkey)
-                for i in range(values):
-                    try:
-                        ver = float(winreg.EnumValue(bkey, i)[0])
-                        if ver not in vs_vers:
-                            vs_vers.append(ver)
-                    except ValueError:
-                        pass
-                for i in range(subkeys):
-                    try:
-                        ver = float(winreg.EnumKey(bkey, i))
-                        if ver not in vs_vers:
-                            vs_vers.append(ver)
-                    except ValueError:
-                        pass
+                with bkey:
+                    subkeys, values, _ = winreg.QueryInfoKey(bkey)
+                    names = itertools.chain(
+                        (enum_value(bkey, i)[0] for i in range(values)),
+                        (enum_key(bkey, i) for i in range(subkeys)))
+                    for name in names:
+                        try:
+                            vs_vers.add(float(name))
+                        except ValueError:
+                            pass
         return sorted(vs_vers)
 
     def find_programdata_vs_vers(self):
@@ -802,7 +1078,7 @@ class SystemInfo:
         """
         return float('.'.join(version.split('.')[:2]))
 
-    @property
+    @_cached_property
     def VSInstallDir(self):
         """
         Microsoft Visual Studio directory.
@@ -812,14 +1088,22 @@ class SystemInfo:
         str
             path
         """
+        if self.vs_ver >= 15.0:
+            # VS2017+ are not registered, use known paths or ask "vswhere.exe"
+            vs_dir = (self.known_vs_paths.get(self.vs_ver) or
+                      _vswhere_installation_path(self.vs_ver))
+            if vs_dir:
+                return vs_dir
+
         # Default path
+        vs_ver = '%0.1f' % self.vs_ver
         default = join(self.ProgramFilesx86,
-                       'Microsoft Visual Studio %0.1f' % self.vs_ver)
+                       'Microsoft Visual Studio %s' % vs_ver)
 
         # Try to get path from registry, if fail use default path
-        return self.ri.lookup(self.ri.vs, '%0.1f' % self.vs_ver) or default
+        return self.ri.lookup(self.ri.vs, vs_ver) or default
 
-    @property
+    @_cached_property
     def VCInstallDir(self):
         """
         Microsoft Visual C++ directory.
@@ -831,9 +1115,9 @@ class SystemInfo:
         """
         path = self._guess_vc() or self._guess_vc_legacy()
 
-        if not isdir(path):
+        if not _isdir(path):
             msg = 'Microsoft Visual C++ directory not found'
-            raise distutils.errors.DistutilsPlatformError(msg)
+            raise DistutilsPlatformError(msg)
 
         return path
 
@@ -849,14 +1133,7 @@ class SystemInfo:
         if self.vs_ver <= 14.0:
             return ''
 
-        try:
-            # First search in known VS paths
-            vs_dir = self.known_vs_paths[self.vs_ver]
-        except KeyError:
-            # Else, search with path from registry
-            vs_dir = self.VSInstallDir
-
-        guess_vc = join(vs_dir, r'VC\Tools\MSVC')
+        guess_vc = join(self.VSInstallDir, r'VC\Tools\MSVC')
 
         # Subdir with VC exact version as name
         try:
@@ -876,16 +1153,17 @@ class SystemInfo:
         str
             path
         """
+        vs_ver = '%0.1f' % self.vs_ver
         default = join(self.ProgramFilesx86,
-                       r'Microsoft Visual Studio %0.1f\VC' % self.vs_ver)
+                       r'Microsoft Visual Studio %s\VC' % vs_ver)
 
         # Try to get "VC++ for Python" path from registry as default path
-        reg_path = join(self.ri.vc_for_python, '%0.1f' % self.vs_ver)
+        reg_path = join(self.ri.vc_for_python, vs_ver)
         python_vc = self.ri.lookup(reg_path, 'installdir')
         default_vc = join(python_vc, 'VC') if python_vc else default
 
         # Try to get path from registry, if fail use default path
-        return self.ri.lookup(self.ri.vc, '%0.1f' % self.vs_ver) or default_vc
+        return self.ri.lookup(self.ri.vc, vs_ver) or default_vc
 
     @property
     def WindowsSdkVersion(self):
@@ -899,14 +1177,9 @@ class SystemInfo:
         """
         if self.vs_ver <= 9.0:
             return '7.0', '6.1', '6.0a'
-        elif self.vs_ver == 10.0:
-            return '7.1', '7.0a'
-        elif self.vs_ver == 11.0:
-            return '8.0', '8.0a'
-        elif self.vs_ver == 12.0:
-            return '8.1', '8.1a'
         elif self.vs_ver >= 14.0:
             return '10.0', '8.1'
+        return self._windows_sdk_versions.get(self.vs_ver)
 
     @property
     def WindowsSdkLastVersion(self):
@@ -920,7 +1193,7 @@ class SystemInfo:
         """
         return self._use_last_dir_name(join(self.WindowsSdkDir, 'lib'))
 
-    @property
+    @_cached_property
     def WindowsSdkDir(self):
         """
         Microsoft Windows SDK directory.
@@ -930,40 +1203,40 @@ class SystemInfo:
         str
             path
         """
+        sdk_versions = self.WindowsSdkVersion
         sdkdir = ''
-        for ver in self.WindowsSdkVersion:
+        for ver in sdk_versions:
             # Try to get it from registry
             loc = join(self.ri.windows_sdk, 'v%s' % ver)
             sdkdir = self.ri.lookup(loc, 'installationfolder')
             if sdkdir:
                 break
-        if not sdkdir or not isdir(sdkdir):
+        if not sdkdir or not _isdir(sdkdir):
             # Try to get "VC++ for Python" version from registry
             path = join(self.ri.vc_for_python, '%0.1f' % self.vc_ver)
             install_base = self.ri.lookup(path, 'installdir')
             if install_base:
                 sdkdir = join(install_base, 'WinSDK')
-        if not sdkdir or not isdir(sdkdir):
-            # If fail, use default new path
-            for ver in self.WindowsSdkVersion:
-                intver = ver[:ver.rfind('.')]
-                path = r'Microsoft SDKs\Windows Kits\%s' % intver
-                d = join(self.ProgramFiles, path)
-                if isdir(d):
-                    sdkdir = d
-        if not sdkdir or not isdir(sdkdir):
-            # If fail, use default old path
-            for ver in self.WindowsSdkVersion:
-                path = r'Microsoft SDKs\Windows\v%s' % ver
-                d = join(self.ProgramFiles, path)
-                if isdir(d):
-                    sdkdir = d
+        if not sdkdir or not _isdir(sdkdir):
+            # If fail, use default new path, else default old path
+            new_dirs = [
+                join(self.ProgramFiles,
+                     r'Microsoft SDKs\Windows Kits\%s' % ver[:ver.rfind('.')])
+                for ver in sdk_versions]
+            old_dirs = [
+                join(self.ProgramFiles, r'Microsoft SDKs\Windows\v%s' % ver)
+                for ver in sdk_versions]
+            for dirs in (new_dirs, old_dirs):
+                extant = [d for d in dirs if _isdir(d)]
+                if extant:
+                    sdkdir = extant[-1]
+                    break
         if not sdkdir:
             # If fail, use Platform SDK
             sdkdir = join(self.VCInstallDir, 'PlatformSDK')
         return sdkdir
 
-    @property
+    @_cached_property
     def WindowsSDKExecutablePath(self):
         """
         Microsoft Windows SDK executable directory.
@@ -987,10 +1260,10 @@ class SystemInfo:
         regpaths = []
         if self.vs_ver >= 14.0:
             for ver in self.NetFxSdkVersion:
-                regpaths += [join(self.ri.netfx_sdk, ver, fx)]
+                regpaths.append(join(self.ri.netfx_sdk, ver, fx))
 
         for ver in self.WindowsSdkVersion:
-            regpaths += [join(self.ri.windows_sdk, 'v%sA' % ver, fx)]
+            regpaths.append(join(self.ri.windows_sdk, 'v%sA' % ver, fx))
 
         # Return installation folder from the more recent path
         for path in regpaths:
@@ -998,7 +1271,7 @@ class SystemInfo:
             if execpath:
                 return execpath
 
-    @property
+    @_cached_property
     def FSharpInstallDir(self):
         """
         Microsoft Visual F# directory.
@@ -1011,7 +1284,7 @@ class SystemInfo:
         path = join(self.ri.visualstudio, r'%0.1f\Setup\F#' % self.vs_ver)
         return self.ri.lookup(path, 'productdir') or ''
 
-    @property
+    @_cached_property
     def UniversalCRTSdkDir(self):
         """
         Microsoft Universal CRT SDK directory.
@@ -1022,7 +1295,7 @@ class SystemInfo:
             path
         """
         # Set Kit Roots versions for specified MSVC++ version
-        vers = ('10', '81') if self.vs_ver >= 14.0 else ()
+        vers = self._ucrt_sdk_versions if self.vs_ver >= 14.0 else ()
 
         # Find path of the more recent Kit
         for ver in vers:
@@ -1054,12 +1327,9 @@ class SystemInfo:
             versions
         """
         # Set FxSdk versions for specified VS version
-        return (('4.7.2', '4.7.1', '4.7',
-                 '4.6.2', '4.6.1', '4.6',
-                 '4.5.2', '4.5.1', '4.5')
-                if self.vs_ver >= 14.0 else ())
+        return self._netfx_sdk_versions if self.vs_ver >= 14.0 else ()
 
-    @property
+    @_cached_property
     def NetFxSdkDir(self):
         """
         Microsoft .NET Framework SDK directory.
@@ -1077,7 +1347,7 @@ class SystemInfo:
                 break
         return sdkdir
 
-    @property
+    @_cached_property
     def FrameworkDir32(self):
         """
         Microsoft .NET Framework 32bit directory.
@@ -1093,7 +1363,7 @@ class SystemInfo:
         # Try to get path from registry, if fail use default path
         return self.ri.lookup(self.ri.vc, 'frameworkdir32') or guess_fw
 
-    @property
+    @_cached_property
     def FrameworkDir64(self):
         """
         Microsoft .NET Framework 64bit directory.
@@ -1163,10 +1433,14 @@ class SystemInfo:
             return 'v3.0', 'v2.0.50727'
 
     @staticmethod
+    @functools.lru_cache(maxsize=128)
     def _use_last_dir_name(path, prefix=''):
         """
         Return name of the last dir in path or '' if no dir found.
 
+        Results are cached since tools directories are not expected to
+        change while building.
+
         Parameters
         ----------
         path: str
@@ -1179,11 +1453,11 @@ class SystemInfo:
         str
             name
         """
+        # "scandir" entries know if they are directories without extra stat
         matching_dirs = (
-            dir_name
-            for dir_name in reversed(listdir(path))
-            if isdir(join(path, dir_name)) and
-            dir_name.startswith(prefix)
+            entry.name
+            for entry in reversed(list(scandir(path)))
+            if entry.is_dir() and entry.name.startswith(prefix)
         )
         return next(matching_dirs, None) or ''
 
@@ -1212,6 +1486,11 @@ class EnvironmentInfo:
     # Variables and properties in this class use originals CamelCase variables
     # names from Microsoft source files for more easy comparison.
 
+    # Paths layouts already resolved in this process, see "_layout".
+    # Environments are cached by "msvc9_query_vcvarsall", so layouts serve
+    # direct users of this class and rebuilds after inherited paths changed.
+    _layouts = {}
+
     def __init__(self, arch, vc_ver=None, vc_min_ver=0):
         self.pi = PlatformInfo(arch)
         self.ri = RegistryInfo(self.pi)
@@ -1219,7 +1498,7 @@ class EnvironmentInfo:
 
         if self.vc_ver < vc_min_ver:
             err = 'No suitable Microsoft Visual C++ version found'
-            raise distutils.errors.DistutilsPlatformError(err)
+            raise DistutilsPlatformError(err)
 
     @property
     def vs_ver(self):
@@ -1245,7 +1524,7 @@ class EnvironmentInfo:
         """
         return self.si.vc_ver
 
-    @property
+    @_cached_property
     def VSTools(self):
         """
         Microsoft Visual Studio Tools.
@@ -1259,13 +1538,14 @@ class EnvironmentInfo:
 
         if self.vs_ver >= 14.0:
             arch_subdir = self.pi.current_dir(hidex86=True, x64=True)
-            paths += [r'Common7\IDE\CommonExtensions\Microsoft\TestWindow']
-            paths += [r'Team Tools\Performance Tools']
-            paths += [r'Team Tools\Performance Tools%s' % arch_subdir]
+            paths.extend((r'Common7\IDE\CommonExtensions\Microsoft\TestWindow',
+                          r'Team Tools\Performance Tools',
+                          r'Team Tools\Performance Tools%s' % arch_subdir))
 
-        return [join(self.si.VSInstallDir, path) for path in paths]
+        vs_dir = self.si.VSInstallDir
+        return [join(vs_dir, path) for path in paths]
 
-    @property
+    @_cached_property
     def VCIncludes(self):
         """
         Microsoft Visual C++ & Microsoft Foundation Class Includes.
@@ -1275,10 +1555,10 @@ class EnvironmentInfo:
         list of str
             paths
         """
-        return [join(self.si.VCInstallDir, 'Include'),
-                join(self.si.VCInstallDir, r'ATLMFC\Include')]
+        vc_dir = self.si.VCInstallDir
+        return [join(vc_dir, 'Include'), join(vc_dir, r'ATLMFC\Include')]
 
-    @property
+    @_cached_property
     def VCLibraries(self):
         """
         Microsoft Visual C++ & Microsoft Foundation Class Libraries.
@@ -1297,9 +1577,10 @@ class EnvironmentInfo:
         if self.vs_ver >= 14.0:
             paths += [r'Lib\store%s' % arch_subdir]
 
-        return [join(self.si.VCInstallDir, path) for path in paths]
+        vc_dir = self.si.VCInstallDir
+        return [join(vc_dir, path) for path in paths]
 
-    @property
+    @_cached_property
     def VCStoreRefs(self):
         """
         Microsoft Visual C++ store references Libraries.
@@ -1313,7 +1594,7 @@ class EnvironmentInfo:
             return []
         return [join(self.si.VCInstallDir, r'Lib\store\references')]
 
-    @property
+    @_cached_property
     def VCTools(self):
         """
         Microsoft Visual C++ Tools.
@@ -1323,34 +1604,33 @@ class EnvironmentInfo:
         list of str
             paths
         """
-        si = self.si
-        tools = [join(si.VCInstallDir, 'VCPackages')]
+        vc_dir = self.si.VCInstallDir
+        tools = [join(vc_dir, 'VCPackages')]
 
         forcex86 = True if self.vs_ver <= 10.0 else False
         arch_subdir = self.pi.cross_dir(forcex86)
         if arch_subdir:
-            tools += [join(si.VCInstallDir, 'Bin%s' % arch_subdir)]
+            tools += [join(vc_dir, 'Bin%s' % arch_subdir)]
 
         if self.vs_ver == 14.0:
             path = 'Bin%s' % self.pi.current_dir(hidex86=True)
-            tools += [join(si.VCInstallDir, path)]
+            tools += [join(vc_dir, path)]
 
         elif self.vs_ver >= 15.0:
             host_dir = (r'bin\HostX86%s' if self.pi.current_is_x86() else
                         r'bin\HostX64%s')
-            tools += [join(
-                si.VCInstallDir, host_dir % self.pi.target_dir(x64=True))]
+            tools += [join(vc_dir, host_dir % self.pi.target_dir(x64=True))]
 
             if self.pi.current_cpu != self.pi.target_cpu:
                 tools += [join(
-                    si.VCInstallDir, host_dir % self.pi.current_dir(x64=True))]
+                    vc_dir, host_dir % self.pi.current_dir(x64=True))]
 
         else:
-            tools += [join(si.VCInstallDir, 'Bin')]
+            tools += [join(vc_dir, 'Bin')]
 
         return tools
 
-    @property
+    @_cached_property
     def OSLibraries(self):
         """
         Microsoft Windows SDK Libraries.
@@ -1367,10 +1647,9 @@ class EnvironmentInfo:
         else:
             arch_subdir = self.pi.target_dir(x64=True)
             lib = join(self.si.WindowsSdkDir, 'lib')
-            libver = self._sdk_subdir
-            return [join(lib, '%sum%s' % (libver, arch_subdir))]
+            return [join(lib, self._sdk_subdir, 'um%s' % arch_subdir)]
 
-    @property
+    @_cached_property
     def OSIncludes(self):
         """
         Microsoft Windows SDK Include.
@@ -1390,11 +1669,11 @@ class EnvironmentInfo:
                 sdkver = self._sdk_subdir
             else:
                 sdkver = ''
-            return [join(include, '%sshared' % sdkver),
-                    join(include, '%sum' % sdkver),
-                    join(include, '%swinrt' % sdkver)]
+            return [join(include, sdkver, 'shared'),
+                    join(include, sdkver, 'um'),
+                    join(include, sdkver, 'winrt')]
 
-    @property
+    @_cached_property
     def OSLibpath(self):
         """
         Microsoft Windows SDK Libraries Paths.
@@ -1430,7 +1709,7 @@ class EnvironmentInfo:
             ]
         return libpath
 
-    @property
+    @_cached_property
     def SdkTools(self):
         """
         Microsoft Windows SDK Tools.
@@ -1485,12 +1764,11 @@ class EnvironmentInfo:
         Return
         ------
         str
-            subdir
+            subdir, or empty string if not versioned
         """
-        ucrtver = self.si.WindowsSdkLastVersion
-        return ('%s\\' % ucrtver) if ucrtver else ''
+        return self.si.WindowsSdkLastVersion or ''
 
-    @property
+    @_cached_property
     def SdkSetup(self):
         """
         Microsoft Windows SDK Setup.
@@ -1505,7 +1783,7 @@ class EnvironmentInfo:
 
         return [join(self.si.WindowsSdkDir, 'Setup')]
 
-    @property
+    @_cached_property
     def FxTools(self):
         """
         Microsoft .NET Framework Tools.
@@ -1527,14 +1805,14 @@ class EnvironmentInfo:
 
         tools = []
         if include32:
-            tools += [join(si.FrameworkDir32, ver)
-                      for ver in si.FrameworkVersion32]
+            fw_dir = si.FrameworkDir32
+            tools += [join(fw_dir, ver) for ver in si.FrameworkVersion32]
         if include64:
-            tools += [join(si.FrameworkDir64, ver)
-                      for ver in si.FrameworkVersion64]
+            fw_dir = si.FrameworkDir64
+            tools += [join(fw_dir, ver) for ver in si.FrameworkVersion64]
         return tools
 
-    @property
+    @_cached_property
     def NetFxSDKLibraries(self):
         """
         Microsoft .Net Framework SDK Libraries.
@@ -1550,7 +1828,7 @@ class EnvironmentInfo:
         arch_subdir = self.pi.target_dir(x64=True)
         return [join(self.si.NetFxSdkDir, r'lib\um%s' % arch_subdir)]
 
-    @property
+    @_cached_property
     def NetFxSDKIncludes(self):
         """
         Microsoft .Net Framework SDK Includes.
@@ -1565,7 +1843,7 @@ class EnvironmentInfo:
 
         return [join(self.si.NetFxSdkDir, r'include\um')]
 
-    @property
+    @_cached_property
     def VsTDb(self):
         """
         Microsoft Visual Studio Team System Database.
@@ -1577,7 +1855,7 @@ class EnvironmentInfo:
         """
         return [join(self.si.VSInstallDir, r'VSTSDB\Deploy')]
 
-    @property
+    @_cached_property
     def MSBuild(self):
         """
         Microsoft Build Engine.
@@ -1597,15 +1875,16 @@ class EnvironmentInfo:
             arch_subdir = ''
 
         path = r'MSBuild\%0.1f\bin%s' % (self.vs_ver, arch_subdir)
-        build = [join(base_path, path)]
+        path = join(base_path, path)
+        build = [path]
 
         if self.vs_ver >= 15.0:
             # Add Roslyn C# & Visual Basic Compiler
-            build += [join(base_path, path, 'Roslyn')]
+            build += [join(path, 'Roslyn')]
 
         return build
 
-    @property
+    @_cached_property
     def HTMLHelpWorkshop(self):
         """
         Microsoft HTML Help Workshop.
@@ -1620,7 +1899,7 @@ class EnvironmentInfo:
 
         return [join(self.si.ProgramFilesx86, 'HTML Help Workshop')]
 
-    @property
+    @_cached_property
     def UCRTLibraries(self):
         """
         Microsoft Universal C Runtime SDK Libraries.
@@ -1635,10 +1914,9 @@ class EnvironmentInfo:
 
         arch_subdir = self.pi.target_dir(x64=True)
         lib = join(self.si.UniversalCRTSdkDir, 'lib')
-        ucrtver = self._ucrt_subdir
-        return [join(lib, '%sucrt%s' % (ucrtver, arch_subdir))]
+        return [join(lib, self._ucrt_subdir, 'ucrt%s' % arch_subdir)]
 
-    @property
+    @_cached_property
     def UCRTIncludes(self):
         """
         Microsoft Universal C Runtime SDK Include.
@@ -1652,7 +1930,7 @@ class EnvironmentInfo:
             return []
 
         include = join(self.si.UniversalCRTSdkDir, 'include')
-        return [join(include, '%sucrt' % self._ucrt_subdir)]
+        return [join(include, self._ucrt_subdir, 'ucrt')]
 
     @property
     def _ucrt_subdir(self):
@@ -1662,12 +1940,11 @@ class EnvironmentInfo:
         Return
         ------
         str
-            subdir
+            subdir, or empty string if not versioned
         """
-        ucrtver = self.si.UniversalCRTSdkLastVersion
-        return ('%s\\' % ucrtver) if ucrtver else ''
+        return self.si.UniversalCRTSdkLastVersion or ''
 
-    @property
+    @_cached_property
     def FSharp(self):
         """
         Microsoft Visual F#.
@@ -1677,12 +1954,12 @@ class EnvironmentInfo:
         list of str
             paths
         """
-        if 11.0 > self.vs_ver > 12.0:
+        if self.vs_ver < 11.0 or self.vs_ver > 12.0:
             return []
 
         return [self.si.FSharpInstallDir]
 
-    @property
+    @_cached_property
     def VCRuntimeRedist(self):
         """
         Microsoft Visual C++ runtime redistributable dll.
@@ -1699,7 +1976,7 @@ class EnvironmentInfo:
         prefixes = []
         tools_path = self.si.VCInstallDir
         redist_path = dirname(tools_path.replace(r'\Tools', r'\Redist'))
-        if isdir(redist_path):
+        if _isdir(redist_path):
             # Redist version may not be exactly the same as tools
             redist_path = join(redist_path, listdir(redist_path)[-1])
             prefixes += [redist_path, join(redist_path, 'onecore')]
@@ -1714,7 +1991,7 @@ class EnvironmentInfo:
         # vcruntime path
         for prefix, crt_dir in itertools.product(prefixes, crt_dirs):
             path = join(prefix, arch_subdir, crt_dir, vcruntime)
-            if isfile(path):
+            if _isfile(path):
                 return path
 
     def return_env(self, exists=True):
@@ -1731,42 +2008,86 @@ class EnvironmentInfo:
         dict
             environment
         """
+        paths_layout, vcruntime = self._layout()
+        if exists:
+            # List parents first, so "_build_paths" checks sibling tools
+            # directories with a single listing of their parent
+            _list_shared_parents(
+                path for _, spec_path_lists in paths_layout
+                for spec_paths in spec_path_lists for path in spec_paths)
         env = dict(
-            include=self._build_paths('include',
-                                      [self.VCIncludes,
-                                       self.OSIncludes,
-                                       self.UCRTIncludes,
-                                       self.NetFxSDKIncludes],
-                                      exists),
-            lib=self._build_paths('lib',
-                                  [self.VCLibraries,
-                                   self.OSLibraries,
-                                   self.FxTools,
-                                   self.UCRTLibraries,
-                                   self.NetFxSDKLibraries],
-                                  exists),
-            libpath=self._build_paths('libpath',
-                                      [self.VCLibraries,
-                                       self.FxTools,
-                                       self.VCStoreRefs,
-                                       self.OSLibpath],
-                                      exists),
-            path=self._build_paths('path',
-                                   [self.VCTools,
-                                    self.VSTools,
-                                    self.VsTDb,
-                                    self.SdkTools,
-                                    self.SdkSetup,
-                                    self.FxTools,
-                                    self.MSBuild,
-                                    self.HTMLHelpWorkshop,
-                                    self.FSharp],
-                                   exists),
+            (name, self._build_paths(name, spec_path_lists, exists))
+            for name, spec_path_lists in paths_layout
         )
-        if self.vs_ver >= 14 and isfile(self.VCRuntimeRedist):
-            env['py_vcruntime_redist'] = self.VCRuntimeRedist
+        if vcruntime and _isfile(vcruntime):
+            env['py_vcruntime_redist'] = vcruntime
         return env
 
+    @property
+    def _layout_key(self):
+        """
+        Key identifying the tool chain for the layout cache.
+
+        Only use values known before resolving the layout, since resolving
+        the Visual C++ directory may update "vc_ver".
+
+        Return
+        ------
+        tuple
+            key
+        """
+        return self.vs_ver, self.pi.arch, self.pi.current_cpu
+
+    def _layout(self):
+        """
+        Return paths candidates for each environment variable.
+
+        Layouts only depend on installed tools, so are cached by version and
+        platform for the process lifetime, with the resolved "vc_ver".
+
+        Return
+        ------
+        tuple
+            Tuple of (name, list of paths lists) pairs,
+            and the runtime redistributable dll path or None.
+        """
+        # Key must be computed before resolving the layout
+        key = self._layout_key
+        try:
+            paths_layout, vcruntime, self.si.vc_ver = self._layouts[key]
+        except KeyError:
+            pass
+        else:
+            return paths_layout, vcruntime
+
+        paths_layout = (
+            ('include', [self.VCIncludes,
+                         self.OSIncludes,
+                         self.UCRTIncludes,
+                         self.NetFxSDKIncludes]),
+            ('lib', [self.VCLibraries,
+                     self.OSLibraries,
+                     self.FxTools,
+                     self.UCRTLibraries,
+                     self.NetFxSDKLibraries]),
+            ('libpath', [self.VCLibraries,
+                         self.FxTools,
+                         self.VCStoreRefs,
+                         self.OSLibpath]),
+            ('path', [self.VCTools,
+                      self.VSTools,
+                      self.VsTDb,
+                      self.SdkTools,
+                      self.SdkSetup,
+                      self.FxTools,
+                      self.MSBuild,
+                      self.HTMLHelpWorkshop,
+                      self.FSharp]),
+        )
+        vcruntime = self.VCRuntimeRedist if self.vs_ver >= 14 else None
+        self._layouts[key] = paths_layout, vcruntime, self.vc_ver
+        return paths_layout, vcruntime
+
     def _build_paths(self, name, spec_path_lists, exists):
         """
         Given an environment variable name and specified paths,
@@ -1789,37 +2110,53 @@ class EnvironmentInfo:
         str
             Pathsep-separated paths
         """
-        # flatten spec_path_lists
-        spec_paths = itertools.chain.from_iterable(spec_path_lists)
-        env_paths = environ.get(name, '').split(pathsep)
-        paths = itertools.chain(spec_paths, env_paths)
-        extant_paths = list(filter(isdir, paths)) if exists else paths
+        # deduplicate first, so each directory is checked only once
+        unique_paths = OrderedDict()
+        for path in self._candidate_paths(name, spec_path_lists):
+            unique_paths.setdefault(self._path_key(path), path)
+        extant_paths = [path for path in unique_paths.values()
+                        if not exists or _isdir(path)]
         if not extant_paths:
             msg = "%s environment variable is empty" % name.upper()
-            raise distutils.errors.DistutilsPlatformError(msg)
-        unique_paths = self._unique_everseen(extant_paths)
-        return pathsep.join(unique_paths)
+            raise DistutilsPlatformError(msg)
+        return pathsep.join(extant_paths)
 
-    # from Python docs
     @staticmethod
-    def _unique_everseen(iterable, key=None):
+    def _candidate_paths(name, spec_path_lists):
         """
-        List unique elements, preserving order.
-        Remember all elements ever seen.
+        Return specified paths followed by paths from the environment
+        variable.
 
-        _unique_everseen('AAAABBBCCDAABBB') --> A B C D
+        Parameters
+        ----------
+        name: str
+            Environment variable name
+        spec_path_lists: list of str
+            Paths
 
-        _unique_everseen('ABBCcAD', str.lower) --> A B C D
+        Return
+        ------
+        list of str
+            paths
         """
-        seen = set()
-        seen_add = seen.add
-        if key is None:
-            for element in filterfalse(seen.__contains__, iterable):
-                seen_add(element)
-                yield element
-        else:
-            for element in iterable:
-                k = key(element)
-                if k not in seen:
-                    seen_add(k)
-                    yield element
+        # flatten spec_path_lists
+        paths = [path for spec_paths in spec_path_lists for path in spec_paths]
+        paths.extend(_split_paths(environ.get(name, '')))
+        return paths
+
+    @staticmethod
+    def _path_key(path):
+        """
+        Return a key identifying paths pointing to the same location.
+
+        Parameters
+        ----------
+        path: str
+            Path
+
+        Return
+        ------
+        str
+            Normalized path
+        """
+        return normcase(normpath(path))
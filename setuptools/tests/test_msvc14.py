@@ -82,3 +82,30 @@ class TestMSVC14:
             assert os.path.isdir(path)
         else:
             pytest.skip("VS 2015 is not installed")
+
+
+def test_get_vc_env_cached(monkeypatch):
+    import setuptools.msvc as _msvccompiler
+
+    calls = []
+
+    def _get_vc_env(plat_spec):
+        calls.append(plat_spec)
+        return {'include': 'include_dir'}
+
+    monkeypatch.delitem(
+        _msvccompiler.environ, 'DISTUTILS_USE_SDK', raising=False)
+    monkeypatch.setitem(_msvccompiler.environ, 'path', 'inherited')
+    monkeypatch.setattr(_msvccompiler, '_msvc14_env_cache', {})
+    monkeypatch.setattr(_msvccompiler, '_msvc14_get_vc_env', _get_vc_env)
+
+    env = _msvccompiler.msvc14_get_vc_env('x86')
+    env['include'] = 'changed'
+    assert _msvccompiler.msvc14_get_vc_env('x86') == {
+        'include': 'include_dir'}
+    assert calls == ['x86']
+
+    # Environment is resolved again if inherited paths changed
+    monkeypatch.setitem(_msvccompiler.environ, 'path', 'changed')
+    _msvccompiler.msvc14_get_vc_env('x86')
+    assert calls == ['x86', 'x86']
@@ -0,0 +1,305 @@
+"""
+Tests for msvc support module (platform independent unit tests).
+"""
+
+import os
+from distutils.errors import DistutilsPlatformError
+
+import pytest
+
+from setuptools import msvc
+
+
+def _query_vcvarsall(ver, arch='x86', *args, **kwargs):
+    raise DistutilsPlatformError("Unable to find vcvarsall.bat")
+
+
+@pytest.fixture
+def msvc9_env(monkeypatch):
+    """
+    Make msvc9_query_vcvarsall fall back to a mocked EnvironmentInfo
+    and return the list of its instantiations.
+    """
+    calls = []
+
+    class EnvironmentInfo:
+        env = {'include': 'include_dir'}
+
+        def __init__(self, arch, vc_ver=None, vc_min_ver=0):
+            calls.append((arch, vc_ver))
+            if self.env is None:
+                raise DistutilsPlatformError(
+                    'Microsoft Visual C++ directory not found')
+
+        def return_env(self, exists=True):
+            return dict(self.env)
+
+    monkeypatch.setattr(msvc, '_msvc9_env_cache', {})
+    monkeypatch.setattr(msvc, 'EnvironmentInfo', EnvironmentInfo)
+    monkeypatch.setattr(
+        msvc.msvc9_query_vcvarsall, 'unpatched', _query_vcvarsall,
+        raising=False)
+    return calls
+
+
+def test_msvc9_query_vcvarsall_cached(msvc9_env, monkeypatch):
+    monkeypatch.setitem(msvc.environ, 'path', 'inherited')
+    env = msvc.msvc9_query_vcvarsall(9.0, 'x86')
+    env['include'] = 'changed'
+    assert msvc.msvc9_query_vcvarsall(9.0, 'x86') == {
+        'include': 'include_dir'}
+    msvc.msvc9_query_vcvarsall(9.0, 'amd64')
+    assert msvc9_env == [('x86', 9.0), ('amd64', 9.0)]
+
+    # Environment is resolved again if inherited paths changed
+    monkeypatch.setitem(msvc.environ, 'path', 'changed')
+    msvc.msvc9_query_vcvarsall(9.0, 'x86')
+    assert msvc9_env == [('x86', 9.0), ('amd64', 9.0), ('x86', 9.0)]
+
+
+def test_msvc9_query_vcvarsall_failure_not_cached(msvc9_env, monkeypatch):
+    monkeypatch.setattr(msvc.EnvironmentInfo, 'env', None)
+    for _ in range(2):
+        with pytest.raises(DistutilsPlatformError) as exc_info:
+            msvc.msvc9_query_vcvarsall(9.0, 'x86')
+        assert 'aka.ms/vcpython27' in str(exc_info.value)
+    assert msvc9_env == [('x86', 9.0), ('x86', 9.0)]
+    assert msvc._msvc9_env_cache == {}
+
+
+class _SystemInfo:
+    def __init__(self, vs_ver):
+        self.vs_ver = self.vc_ver = vs_ver
+
+
+@pytest.fixture
+def environment_info(monkeypatch):
+    """
+    Return a factory of EnvironmentInfo for Visual Studio 2017 with mocked
+    paths, where resolving the Visual C++ includes updates "vc_ver" like
+    "SystemInfo._guess_vc" does.
+    """
+    names = (
+        'OSIncludes', 'UCRTIncludes', 'NetFxSDKIncludes', 'VCLibraries',
+        'OSLibraries', 'FxTools', 'UCRTLibraries', 'NetFxSDKLibraries',
+        'VCStoreRefs', 'OSLibpath', 'VCTools', 'VSTools', 'VsTDb', 'SdkTools',
+        'SdkSetup', 'MSBuild', 'HTMLHelpWorkshop', 'FSharp')
+    resolved = []
+
+    def VCIncludes(self):
+        resolved.append(self.si.vc_ver)
+        self.si.vc_ver = 14.16
+        return ['VC\\Include']
+
+    attrs = dict.fromkeys(names, [])
+    attrs.update(VCIncludes=property(VCIncludes), VCRuntimeRedist=None)
+    cls = type('EnvironmentInfo', (msvc.EnvironmentInfo,), attrs)
+    monkeypatch.setattr(cls, '_layouts', {})
+
+    def factory():
+        env_info = cls.__new__(cls)
+        env_info.pi = msvc.PlatformInfo('x86')
+        env_info.si = _SystemInfo(15.0)
+        return env_info
+
+    factory.cls = cls
+    factory.resolved = resolved
+    return factory
+
+
+def test_layout_cache_restores_vc_ver(environment_info):
+    first = environment_info()
+    first.return_env(exists=False)
+    assert first.vc_ver == 14.16
+
+    second = environment_info()
+    env = second.return_env(exists=False)
+    assert second.vc_ver == 14.16
+    assert env['include'].startswith('VC\\Include')
+    assert environment_info.resolved == [15.0]
+    assert len(environment_info.cls._layouts) == 1
+
+
+def test_build_paths_deduplicates_extant_paths(tmpdir, monkeypatch):
+    env_info = msvc.EnvironmentInfo.__new__(msvc.EnvironmentInfo)
+    first = str(tmpdir.mkdir('first'))
+    second = str(tmpdir.mkdir('second'))
+    missing = str(tmpdir / 'missing')
+    monkeypatch.setitem(
+        msvc.environ, 'include', os.pathsep.join([second + os.sep, first]))
+
+    paths = env_info._build_paths(
+        'include', [[second, missing], [first, second]], True)
+    assert paths == os.pathsep.join([second, first])
+
+    paths = env_info._build_paths('include', [[missing, second]], False)
+    assert paths == os.pathsep.join([missing, second, first])
+
+
+def test_build_paths_case_duplicates(monkeypatch):
+    env_info = msvc.EnvironmentInfo.__new__(msvc.EnvironmentInfo)
+    monkeypatch.setitem(msvc.environ, 'lib', 'DIR')
+
+    paths = env_info._build_paths('lib', [['Dir']], False).split(os.pathsep)
+    if os.path.normcase('DIR') == os.path.normcase('Dir'):
+        assert paths == ['Dir']
+    else:
+        assert paths == ['Dir', 'DIR']
+
+
+def test_build_paths_empty(tmpdir, monkeypatch):
+    env_info = msvc.EnvironmentInfo.__new__(msvc.EnvironmentInfo)
+    monkeypatch.setitem(msvc.environ, 'lib', '')
+
+    with pytest.raises(DistutilsPlatformError) as exc_info:
+        env_info._build_paths('lib', [[str(tmpdir / 'missing')]], True)
+    assert 'LIB environment variable is empty' in str(exc_info.value)
+
+
+@pytest.mark.parametrize('vs_ver, expected', [
+    (9.0, []),
+    (10.0, []),
+    (11.0, ['fsharp']),
+    (12.0, ['fsharp']),
+    (14.0, []),
+    (15.0, []),
+])
+def test_fsharp_version_gate(vs_ver, expected):
+    env_info = msvc.EnvironmentInfo.__new__(msvc.EnvironmentInfo)
+    env_info.si = _SystemInfo(vs_ver)
+    env_info.si.FSharpInstallDir = 'fsharp'
+    assert env_info.FSharp == expected
+
+
+@pytest.fixture
+def tools_dir(tmpdir, monkeypatch):
+    """
+    Return a listed parent directory with "Sub" and "Other" directories.
+    """
+    monkeypatch.setattr(msvc, '_child_dirs_cache', {})
+    parent = tmpdir.mkdir('tools')
+    paths = [str(parent.mkdir('Sub')), str(parent.mkdir('Other'))]
+    msvc._list_shared_parents(paths)
+    assert str(parent) in msvc._child_dirs_cache
+    assert all(msvc._isdir(path) for path in paths)
+    return parent
+
+
+def test_isdir_created_after_listing(tools_dir):
+    late = str(tools_dir.mkdir('late'))
+    assert msvc._isdir(late)
+    assert not msvc._isdir(str(tools_dir / 'missing'))
+
+    env_info = msvc.EnvironmentInfo.__new__(msvc.EnvironmentInfo)
+    sub = str(tools_dir / 'Sub')
+    paths = env_info._build_paths('lib', [[sub, late]], True)
+    assert paths.split(os.pathsep) == [sub, late]
+
+
+def test_isdir_alias_missing_from_listing(tools_dir, monkeypatch):
+    # Like 8.3 short names on Windows, the alias exists but isn't listed
+    alias = str(tools_dir.mkdir('SUBDIR~1'))
+    monkeypatch.setitem(
+        msvc._child_dirs_cache, str(tools_dir),
+        frozenset(map(os.path.normcase, ['Sub', 'Other'])))
+    assert msvc._isdir(alias)
+
+    env_info = msvc.EnvironmentInfo.__new__(msvc.EnvironmentInfo)
+    monkeypatch.setitem(msvc.environ, 'path', alias)
+    assert env_info._build_paths('path', [[]], True) == alias
+
+
+class _RegistryInfo:
+    vs = 'VisualStudio\\SxS\\VS7'
+    windows_sdk = 'Microsoft SDKs\\Windows'
+    vc_for_python = 'DevDiv\\VCForPython'
+
+    def __init__(self, values=None):
+        self.values = values or {}
+        self.lookups = []
+
+    def lookup(self, key, name):
+        self.lookups.append((key, name))
+        return self.values.get(name)
+
+
+@pytest.fixture
+def vswhere(monkeypatch):
+    """
+    Mock "vswhere.exe" with a path per version and return its calls.
+    """
+    calls = []
+    paths = {'[16.0,17.0)': 'vswhere16'}
+
+    def _vswhere(*args):
+        calls.append(args)
+        return paths.get(args[-1])
+
+    monkeypatch.setattr(msvc, '_vswhere', _vswhere)
+    msvc._vswhere_installation_path.cache_clear()
+    yield calls
+    msvc._vswhere_installation_path.cache_clear()
+
+
+def _system_info(vs_ver, known_vs_paths=None, registry=None):
+    system_info = msvc.SystemInfo.__new__(msvc.SystemInfo)
+    system_info.vs_ver = system_info.vc_ver = vs_ver
+    system_info.known_vs_paths = known_vs_paths or {}
+    system_info.ri = _RegistryInfo(registry)
+    system_info.ProgramFilesx86 = 'pf86'
+    return system_info
+
+
+def test_vs_install_dir_known_path_first(vswhere):
+    system_info = _system_info(16.0, {16.0: 'known16'}, {'16.0': 'reg16'})
+    assert system_info.VSInstallDir == 'known16'
+    assert vswhere == []
+    assert system_info.ri.lookups == []
+
+
+def test_vs_install_dir_vswhere_before_registry(vswhere):
+    system_info = _system_info(16.0, {15.0: 'known15'}, {'16.0': 'reg16'})
+    assert system_info.VSInstallDir == 'vswhere16'
+    assert vswhere == [('-version', '[16.0,17.0)')]
+    assert system_info.ri.lookups == []
+
+
+def test_vs_install_dir_registry_then_default(vswhere):
+    system_info = _system_info(17.0, registry={'17.0': 'reg17'})
+    assert system_info.VSInstallDir == 'reg17'
+    assert vswhere == [('-version', '[17.0,18.0)')]
+
+    system_info = _system_info(17.0)
+    assert system_info.VSInstallDir == os.path.join(
+        'pf86', 'Microsoft Visual Studio 17.0')
+
+
+def test_vs_install_dir_registered_versions(vswhere):
+    system_info = _system_info(14.0, {15.0: 'known15'}, {'14.0': 'reg14'})
+    assert system_info.VSInstallDir == 'reg14'
+    assert vswhere == []
+    assert system_info.ri.lookups == [(_RegistryInfo.vs, '14.0')]
+
+
+@pytest.mark.parametrize('dirs, expected', [
+    ([r'Windows\v7.1', r'Windows\v7.0a', r'Windows Kits\7'],
+     r'Windows Kits\7'),
+    ([r'Windows\v7.1', r'Windows\v7.0a'], r'Windows\v7.0a'),
+    ([r'Windows\v7.1'], r'Windows\v7.1'),
+    ([], None),
+])
+def test_windows_sdk_dir_default_paths(tmpdir, dirs, expected):
+    program_files = str(tmpdir)
+    for path in dirs:
+        os.makedirs(os.path.join(program_files, 'Microsoft SDKs\\' + path))
+    registry_dir = os.path.join(program_files, 'registry')
+
+    system_info = _system_info(
+        10.0, registry={'installationfolder': registry_dir})
+    system_info.ProgramFiles = program_files
+    if expected is None:
+        # Registry value is kept if no default path exists
+        assert system_info.WindowsSdkDir == registry_dir
+    else:
+        assert system_info.WindowsSdkDir == os.path.join(
+            program_files, 'Microsoft SDKs\\' + expected)